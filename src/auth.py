@@ -286,6 +286,20 @@ class AuthManager:
             "message": "Logged out successfully"
         }
     
+    def purge_expired_sessions(self) -> int:
+        """
+        Remove expired sessions from memory.
+        Sessions are otherwise only dropped when an expired token is verified.
+        
+        Returns:
+            Number of sessions removed
+        """
+        now = datetime.now()
+        expired = [token for token, session in self.sessions.items() if now > session["expires_at"]]
+        for token in expired:
+            del self.sessions[token]
+        return len(expired)
+    
     def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user data by user ID."""
         db = self._load_db()
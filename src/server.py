@@ -4,18 +4,27 @@ Comprehensive FastAPI backend with analytics, file uploads, generation,
 AI review, user management, and dataset export/import.
 """
 
-import json
 import os
-import subprocess
+import re
+import shutil
+import sys
+import threading
+import time
 import asyncio
+import aiofiles
+import orjson
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, UploadFile, File, BackgroundTasks, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, PlainTextResponse, FileResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
+from contextlib import asynccontextmanager
 import logging
 
 # Import our custom modules
@@ -27,11 +36,33 @@ from auth import AuthManager
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson instead of the stdlib encoder."""
+    
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Run the expired-session sweeper while the app is up, and write back any
+    question edits still waiting on the save delay at shutdown.
+    """
+    sweeper = asyncio.create_task(sweep_expired_sessions())
+    yield
+    sweeper.cancel()
+    if _questions_save_pending and _questions_cache is not None:
+        save_questions(_questions_cache)
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Question Generator AI - Complete System",
     description="Full-featured API for question generation, review, and management",
-    version="3.0.0"
+    version="3.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # CORS configuration - Allow all local ports for development
@@ -57,27 +88,93 @@ QUESTIONS_FILE = Path("output/questions.json")
 VALIDATION_REPORT_FILE = Path("output/validation_report.txt")
 BOOKS_DIR = Path("books")
 
+# Number of generation log lines kept in memory
+MAX_LOG_LINES = 200
+
+# Browser cache lifetime (seconds) for analytics responses
+ANALYTICS_MAX_AGE = 5
+
+# Upload limits
+MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_CONCURRENT_UPLOADS = 4
+
+# Read size for the generator subprocess's output
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# Interval (seconds) between sweeps of expired auth sessions
+SESSION_SWEEP_INTERVAL = 15 * 60
+
+# Delay (seconds) before edited questions are written back, so edit bursts share one write
+SAVE_DEBOUNCE_SECONDS = 2
+# os.sendfile only accepts regular-file destinations on Linux
+SENDFILE_SUPPORTED = sys.platform.startswith("linux")
+
+# Generator output markers and how far through a topic each one is (0-1)
+PROGRESS_STEPS = {
+    "TEXT EXTRACTION": 0.1,
+    "Chunking text": 0.2,
+    "GENERATION ENGINE": 0.3,
+    "GENERATION COMPLETE": 0.6,
+    "QUESTION VALIDATION": 0.7,
+    "QUALITY SCORING": 0.8,
+    "Saving validated": 0.9,
+}
+# Single-pass matcher over all markers, so each log line is scanned once
+_PROGRESS_STEP_RE = re.compile("|".join(re.escape(k) for k in PROGRESS_STEPS), re.IGNORECASE)
+_PROGRESS_STEP_FRACTIONS = {k.lower(): v for k, v in PROGRESS_STEPS.items()}
+
+# Upload filename check, matched without lowercasing the whole name
+_PDF_RE = re.compile(r'\.pdf\Z', re.IGNORECASE)
+
 # Initialize managers
 reviewer = QuestionReviewer()
 user_manager = UserManager()
 auth_manager = AuthManager()
 
 # Global state
-generation_state = {
-    "status": "idle",
-    "progress": 0,
-    "message": "",
-    "logs": [],
-    "start_time": None,
-    "end_time": None,
-    "error": None,
-    "current_user": None
-}
+@dataclass(slots=True)
+class GenerationState:
+    """
+    State of the current generation run, shown by /progress and /status.
+    Only touched from the event loop, and no update awaits midway, so readers
+    always see a consistent state without locking.
+    """
+    status: str = "idle"
+    progress: int = 0
+    message: str = ""
+    logs: deque = field(default_factory=lambda: deque(maxlen=MAX_LOG_LINES))
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+    error: Optional[str] = None
+    current_user: Optional[str] = None
+    # Bumped on every state change; seeded from the clock so ETags from a
+    # previous server run can't match
+    version: int = field(default_factory=time.time_ns)
+
+generation_state = GenerationState()
 
 current_session = {
     "user": None
 }
 
+# Cached /files listing as (books directory mtime_ns, files)
+_files_cache: Optional[Tuple[int, list]] = None
+
+# In-memory questions, the file version they were loaded from, and a counter
+# of edits made to them since
+_questions_cache: Optional[list] = None
+_questions_mtime: Optional[tuple] = None
+_questions_revision = 0
+_questions_save_pending = False
+
+# Serializes reads and writes of the questions file across worker threads;
+# reentrant because appends load and may fall back to a full save
+_questions_lock = threading.RLock()
+
+# Loads currently in progress, shared by concurrent requests for the same file version
+_inflight: Dict[tuple, asyncio.Task] = {}
+
 
 # ============================================================================
 # REQUEST/RESPONSE MODELS
@@ -128,23 +225,152 @@ class SessionVerifyRequest(BaseModel):
 # ============================================================================
 
 def load_questions() -> list:
-    """Load questions from JSON file."""
-    if not QUESTIONS_FILE.exists():
-        return []
+    """
+    Load questions from JSON file.
+    The parsed list is kept in memory and reused until the file changes on disk.
+    """
+    global _questions_cache, _questions_mtime
     
-    try:
-        with open(QUESTIONS_FILE, 'r', encoding='utf-8') as f:
-            questions = json.load(f)
+    with _questions_lock:
+        key = questions_file_key()
+        if key is None:
+            return []
+        if _questions_cache is not None and key == _questions_mtime:
+            return _questions_cache
+        
+        try:
+            questions = orjson.loads(QUESTIONS_FILE.read_bytes())
+        except orjson.JSONDecodeError:
+            logger.error("Invalid JSON in questions file")
+            return []
+        
+        _questions_cache, _questions_mtime = questions, key
         return questions
-    except json.JSONDecodeError:
-        logger.error("Invalid JSON in questions file")
-        return []
 
 def save_questions(questions: list):
     """Save questions to JSON file."""
+    global _questions_cache, _questions_mtime
+    
     QUESTIONS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(QUESTIONS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(questions, f, ensure_ascii=False, indent=2)
+    with _questions_lock:
+        QUESTIONS_FILE.write_bytes(orjson.dumps(questions, option=orjson.OPT_INDENT_2))
+        _questions_cache, _questions_mtime = questions, questions_file_key()
+
+def append_questions(new_questions: list) -> int:
+    """
+    Append questions to the JSON file without re-encoding the existing ones.
+    The new items are written over the array's closing bracket, so only the
+    appended questions are serialized. The file lock is held from the load
+    through the write, so concurrent appends and saves can't interleave.
+    
+    Returns:
+        Total number of questions after the append
+    """
+    global _questions_mtime
+    
+    with _questions_lock:
+        existing = load_questions()
+        # Checked before the file is touched, so a non-array file isn't spliced into
+        if not isinstance(existing, list):
+            raise TypeError("Questions file does not hold a JSON array")
+        if not existing or not new_questions:
+            merged = existing + new_questions
+            save_questions(merged)
+            return len(merged)
+        
+        encoded = orjson.dumps(new_questions, option=orjson.OPT_INDENT_2)
+        with open(QUESTIONS_FILE, 'r+b') as f:
+            end = f.seek(0, os.SEEK_END)
+            tail_start = f.seek(max(end - 64, 0))
+            tail = f.read()
+            close = tail.rfind(b"]")
+            if close == -1:
+                merged = existing + new_questions
+                save_questions(merged)
+                return len(merged)
+            
+            # Drop the closing bracket and the whitespace before it, then continue the array
+            f.seek(tail_start + len(tail[:close].rstrip()))
+            f.truncate()
+            f.write(b"," + encoded[1:])
+        
+        existing.extend(new_questions)
+        _questions_mtime = questions_file_key()
+        return len(existing)
+
+async def save_questions_async(questions: list):
+    """Save questions to JSON file in a worker thread, keeping the event loop free."""
+    await asyncio.to_thread(save_questions, questions)
+
+def questions_file_key() -> Optional[tuple]:
+    """Get a version key (mtime, size) for the questions file, or None if missing."""
+    try:
+        stat = QUESTIONS_FILE.stat()
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+async def save_pending_questions():
+    """Write edited questions still waiting on the save delay, if there are any."""
+    global _questions_save_pending
+    
+    if not _questions_save_pending or _questions_cache is None:
+        return
+    # Cleared before the write so edits made during it schedule their own save;
+    # set again if the write fails, so export and shutdown still write the edits
+    _questions_save_pending = False
+    try:
+        await save_questions_async(_questions_cache)
+    except Exception:
+        _questions_save_pending = True
+        raise
+
+async def flush_questions_later():
+    """Write edited questions back to disk once the save delay has passed."""
+    await asyncio.sleep(SAVE_DEBOUNCE_SECONDS)
+    # Nothing is left to write if an export or download already wrote the edits
+    await save_pending_questions()
+
+async def sweep_expired_sessions():
+    """Periodically drop expired auth sessions from memory."""
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+        removed = auth_manager.purge_expired_sessions()
+        if removed:
+            logger.info(f"Removed {removed} expired session(s)")
+
+def questions_version() -> Optional[tuple]:
+    """Get a version key for the questions data, including edits not yet saved."""
+    key = questions_file_key()
+    if key is None:
+        return None
+    return key + (_questions_revision,)
+
+async def coalesced(key: tuple, func, *args):
+    """
+    Run func(*args) in a worker thread, sharing one run between all concurrent
+    callers with the same key so a burst of requests triggers a single load.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.create_task(asyncio.to_thread(func, *args))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    # Shield so one caller disconnecting doesn't cancel the others' result
+    return await asyncio.shield(task)
+
+def questions_etag(key: Optional[tuple]) -> str:
+    """Build a weak ETag from a questions version key."""
+    if key is None:
+        return 'W/"none"'
+    return 'W/"' + "-".join(f"{part:x}" for part in key) + '"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check whether the client's If-None-Match header covers the given ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
 
 def calculate_summary(questions: list) -> Dict[str, Any]:
     """Calculate summary statistics from questions."""
@@ -188,24 +414,93 @@ def calculate_summary(questions: list) -> Dict[str, Any]:
         }
     }
 
+def load_summary() -> Dict[str, Any]:
+    """Load questions and calculate their summary statistics."""
+    return calculate_summary(load_questions())
+
+def list_book_files() -> list:
+    """List PDF files in the books directory with their size and modification time."""
+    files = []
+    # is_file() is answered from the directory listing, so only PDFs get stat()ed
+    with os.scandir(BOOKS_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith('.pdf') or not entry.is_file():
+                continue
+            stat = entry.stat()
+            files.append({
+                "filename": entry.name,
+                "size": stat.st_size,
+                "size_mb": round(stat.st_size / (1024 * 1024), 2),
+                "modified": datetime.fromtimestamp(stat.st_mtime)
+            })
+    return files
+
+def topic_output_file(topic: str) -> Path:
+    """Get the temporary per-topic output file written by the generator."""
+    return Path(f"output/questions_{topic.replace(' ', '_')}.json")
+
+async def read_lines(stream: asyncio.StreamReader):
+    """
+    Yield the lines of a subprocess output stream.
+    Reads in chunks rather than with readline(), which fails on lines longer
+    than the stream's buffer limit.
+    """
+    buffer = b""
+    while chunk := await stream.read(STREAM_CHUNK_SIZE):
+        *lines, buffer = (buffer + chunk).split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
+
+async def read_topic_questions(topic_file: Path) -> list:
+    """Read a per-topic questions file without blocking the event loop."""
+    async with aiofiles.open(topic_file, 'rb') as f:
+        data = await f.read()
+    return orjson.loads(data)
+
+def copy_upload(src, dest: Path, size: int):
+    """
+    Copy an uploaded file to disk.
+    Once the spooled upload has rolled over to a temp file, the kernel copies
+    it directly with sendfile; small in-memory uploads are copied in 1MB chunks.
+    A partially written file is removed if the copy fails.
+    """
+    src.seek(0)
+    try:
+        with open(dest, 'wb') as dst:
+            if SENDFILE_SUPPORTED and getattr(src, "_rolled", False):
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(dst.fileno(), src.fileno(), offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            else:
+                shutil.copyfileobj(src, dst, UPLOAD_CHUNK_SIZE)
+    except Exception:
+        dest.unlink(missing_ok=True)
+        raise
+
 def update_progress(status: str, progress: int, message: str, add_log: bool = True):
     """Update global generation state."""
-    generation_state["status"] = status
-    generation_state["progress"] = progress
-    generation_state["message"] = message
+    generation_state.version += 1
+    generation_state.status = status
+    generation_state.progress = progress
+    generation_state.message = message
     
     if add_log:
         timestamp = datetime.now().strftime("%H:%M:%S")
-        generation_state["logs"].append(f"[{timestamp}] {message}")
+        generation_state.logs.append(f"[{timestamp}] {message}")
         logger.info(message)
 
 async def run_generation_process(topics: List[str], total_questions: int, username: Optional[str] = None):
     """Run the question generation process for multiple topics."""
     try:
-        generation_state["start_time"] = datetime.now()
-        generation_state["logs"] = []
-        generation_state["error"] = None
-        generation_state["current_user"] = username
+        generation_state.start_time = datetime.now()
+        generation_state.logs.clear()
+        generation_state.error = None
+        generation_state.current_user = username
         
         update_progress("generating", 10, f"Starting generation: {total_questions} questions on {len(topics)} topic(s)")
         
@@ -214,6 +509,8 @@ async def run_generation_process(topics: List[str], total_questions: int, userna
         
         for idx, topic in enumerate(topics):
             topic_progress_start = 10 + (idx * 80 // len(topics))
+            topic_progress_span = 80 // len(topics)
+            current_prog = topic_progress_start
             update_progress("generating", topic_progress_start, f"Generating questions for topic: {topic}")
             
             # Build command for this topic
@@ -221,53 +518,70 @@ async def run_generation_process(topics: List[str], total_questions: int, userna
                 "python", "src/main.py",
                 "generate",  # Add the Typer command
                 "--input-dir", "books",
-                "--output-file", f"output/questions_{topic.replace(' ', '_')}.json",
+                "--output-file", str(topic_output_file(topic)),
                 "--topic", topic,
                 "--total-questions", str(questions_per_topic)
             ]
             
-            # Run generation
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1
+            # Run generation in a child process, reading its output without blocking the event loop
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
             )
+            # Drain stderr alongside stdout so a full pipe can't stall the child
+            stderr_task = asyncio.create_task(process.stderr.read())
             
-            for line in process.stdout:
-                line = line.strip()
-                if line:
-                    current_prog = topic_progress_start + (idx + 1) * 60 // len(topics)
-                    update_progress("generating", current_prog, line)
-                    await asyncio.sleep(0.1)
-            
-            process.wait()
+            try:
+                async for raw_line in read_lines(process.stdout):
+                    line = raw_line.decode('utf-8', errors='replace').strip()
+                    if line:
+                        step = _PROGRESS_STEP_RE.search(line)
+                        if step:
+                            fraction = _PROGRESS_STEP_FRACTIONS[step.group(0).lower()]
+                            current_prog = max(current_prog, topic_progress_start + int(topic_progress_span * fraction))
+                        update_progress("generating", current_prog, line)
+                
+                await process.wait()
+                stderr = await stderr_task
+            finally:
+                # Don't leave the generator running if reading its output failed
+                if process.returncode is None:
+                    process.kill()
+                    await process.wait()
+                stderr_task.cancel()
             
             if process.returncode != 0:
-                error_msg = process.stderr.read() if process.stderr else "Unknown error"
-                generation_state["error"] = f"Failed for topic '{topic}': {error_msg}"
+                error_msg = stderr.decode('utf-8', errors='replace') or "Unknown error"
+                generation_state.error = f"Failed for topic '{topic}': {error_msg}"
                 update_progress("error", 0, f"✗ Generation failed for topic: {topic}")
                 return
         
         # Merge all topic files
         update_progress("generating", 90, "Merging questions from all topics...")
-        all_questions = []
+        # Topics can map to the same file (e.g. "a b" and "a_b"); read each file once, for its first topic
+        files_by_path = {}
         for topic in topics:
-            topic_file = Path(f"output/questions_{topic.replace(' ', '_')}.json")
-            if topic_file.exists():
-                with open(topic_file, 'r', encoding='utf-8') as f:
-                    topic_questions = json.load(f)
-                    # Add topic field to each question
-                    for q in topic_questions:
-                        q['source_topic'] = topic
-                    all_questions.extend(topic_questions)
-                topic_file.unlink()  # Delete temporary file
+            files_by_path.setdefault(topic_output_file(topic), topic)
+        topic_files = [(topic, path) for path, topic in files_by_path.items() if path.exists()]
+        
+        # Read all topic files concurrently
+        results = await asyncio.gather(*(read_topic_questions(path) for _, path in topic_files))
+        
+        all_questions = []
+        for (topic, _), topic_questions in zip(topic_files, results):
+            # Add topic field to each question
+            for q in topic_questions:
+                q['source_topic'] = topic
+            all_questions.extend(topic_questions)
+        
+        # Delete temporary files
+        await asyncio.gather(*(asyncio.to_thread(path.unlink, missing_ok=True) for _, path in topic_files))
         
         # Save merged questions
-        save_questions(all_questions)
+        await save_questions_async(all_questions)
         
-        generation_state["end_time"] = datetime.now()
+        generation_state.end_time = datetime.now()
         update_progress("completed", 100, f"✓ Generated {len(all_questions)} questions successfully!")
         
         # Log session for user
@@ -280,7 +594,7 @@ async def run_generation_process(topics: List[str], total_questions: int, userna
             })
             
     except Exception as e:
-        generation_state["error"] = str(e)
+        generation_state.error = str(e)
         update_progress("error", 0, f"✗ Error: {str(e)}")
         logger.error(f"Generation error: {e}")
 
@@ -322,11 +636,16 @@ async def health_check():
 # ============================================================================
 
 @app.get("/summary")
-async def get_summary():
+async def get_summary(request: Request):
     """Get summary statistics for generated questions."""
-    questions = load_questions()
-    summary = calculate_summary(questions)
-    return JSONResponse(content=summary)
+    key = questions_version()
+    etag = questions_etag(key)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={ANALYTICS_MAX_AGE}"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    summary = await coalesced(("summary", key), load_summary)
+    return ORJSONResponse(content=summary, headers=headers)
 
 @app.get("/validation-report")
 async def get_validation_report():
@@ -334,59 +653,84 @@ async def get_validation_report():
     if not VALIDATION_REPORT_FILE.exists():
         raise HTTPException(status_code=404, detail="Validation report not found")
     
-    with open(VALIDATION_REPORT_FILE, 'r', encoding='utf-8') as f:
-        report = f.read()
+    async with aiofiles.open(VALIDATION_REPORT_FILE, 'r', encoding='utf-8') as f:
+        report = await f.read()
     return PlainTextResponse(content=report)
 
 @app.get("/questions")
-async def get_questions(limit: int = 100):
+async def get_questions(request: Request, limit: int = 100):
     """Get questions with optional limit."""
-    questions = load_questions()
-    return JSONResponse(content={
+    key = questions_version()
+    etag = questions_etag(key)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={ANALYTICS_MAX_AGE}"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    questions = await coalesced(("questions", key), load_questions)
+    return ORJSONResponse(content={
         "total": len(questions),
         "limit": limit,
         "questions": questions[:limit]
-    })
+    }, headers=headers)
 
 
 # ============================================================================
 # GENERATION ENDPOINTS (Phase 6-7)
 # ============================================================================
 
+async def save_upload(file: UploadFile, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+    """
+    Check and save one uploaded PDF to the books directory.
+    
+    Raises:
+        ValueError: If the file is not a PDF or is too large
+    """
+    if not _PDF_RE.search(file.filename):
+        raise ValueError("Not a PDF file")
+    
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    
+    if size > MAX_UPLOAD_SIZE:
+        raise ValueError("File too large (>50MB)")
+    
+    file_path = BOOKS_DIR / file.filename
+    async with semaphore:
+        await asyncio.to_thread(copy_upload, file.file, file_path, size)
+    
+    return {
+        "filename": file.filename,
+        "size": size,
+        "path": str(file_path)
+    }
+
 @app.post("/upload")
 async def upload_files(files: List[UploadFile] = File(...)):
     """Upload PDF files to the books directory."""
+    global _files_cache
+    
     BOOKS_DIR.mkdir(parents=True, exist_ok=True)
     
+    # Files with the same name would be copied to one path concurrently; keep the last, as sequential saves would
+    files = list({file.filename: file for file in files}.values())
+    
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPLOADS)
+    results = await asyncio.gather(
+        *(save_upload(file, semaphore) for file in files),
+        return_exceptions=True
+    )
+    # Overwriting an existing file doesn't change the directory mtime
+    _files_cache = None
+    
     uploaded_files = []
     errors = []
+    for file, result in zip(files, results):
+        if isinstance(result, Exception):
+            errors.append(f"{file.filename}: {str(result)}")
+        else:
+            uploaded_files.append(result)
     
-    for file in files:
-        try:
-            if not file.filename.lower().endswith('.pdf'):
-                errors.append(f"{file.filename}: Not a PDF file")
-                continue
-            
-            content = await file.read()
-            
-            if len(content) > 50 * 1024 * 1024:
-                errors.append(f"{file.filename}: File too large (>50MB)")
-                continue
-            
-            file_path = BOOKS_DIR / file.filename
-            with open(file_path, 'wb') as f:
-                f.write(content)
-            
-            uploaded_files.append({
-                "filename": file.filename,
-                "size": len(content),
-                "path": str(file_path)
-            })
-            
-        except Exception as e:
-            errors.append(f"{file.filename}: {str(e)}")
-    
-    return JSONResponse(content={
+    return ORJSONResponse(content={
         "uploaded": uploaded_files,
         "errors": errors,
         "total_uploaded": len(uploaded_files),
@@ -396,7 +740,7 @@ async def upload_files(files: List[UploadFile] = File(...)):
 @app.post("/generate")
 async def start_generation(request: GenerationRequest, background_tasks: BackgroundTasks):
     """Start multi-topic question generation."""
-    if generation_state["status"] == "generating":
+    if generation_state.status == "generating":
         raise HTTPException(status_code=409, detail="Generation already in progress")
     
     if request.total_questions < 100 or request.total_questions > 10000:
@@ -405,13 +749,14 @@ async def start_generation(request: GenerationRequest, background_tasks: Backgro
     if not request.topics or len(request.topics) == 0:
         raise HTTPException(status_code=400, detail="At least one topic is required")
     
-    if not BOOKS_DIR.exists() or not list(BOOKS_DIR.glob("*.pdf")):
+    if not BOOKS_DIR.exists() or next(BOOKS_DIR.glob("*.pdf"), None) is None:
         raise HTTPException(status_code=400, detail="No PDF files found. Please upload files first.")
     
-    generation_state["status"] = "starting"
-    generation_state["progress"] = 0
-    generation_state["logs"] = []
-    generation_state["error"] = None
+    generation_state.version += 1
+    generation_state.status = "starting"
+    generation_state.progress = 0
+    generation_state.logs.clear()
+    generation_state.error = None
     
     background_tasks.add_task(
         run_generation_process,
@@ -420,7 +765,7 @@ async def start_generation(request: GenerationRequest, background_tasks: Backgro
         current_session.get("user")
     )
     
-    return JSONResponse(content={
+    return ORJSONResponse(content={
         "status": "started",
         "message": f"Generation started for {len(request.topics)} topic(s)",
         "topics": request.topics,
@@ -428,48 +773,55 @@ async def start_generation(request: GenerationRequest, background_tasks: Backgro
     })
 
 @app.get("/progress")
-async def get_progress():
-    """Get current generation progress."""
+async def get_progress(request: Request):
+    """
+    Get current generation progress.
+    Polls are answered with 304 Not Modified while the state is unchanged.
+    """
+    etag = f'W/"{generation_state.version:x}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    
+    logs = generation_state.logs
     duration = None
-    if generation_state["start_time"]:
-        end = generation_state["end_time"] or datetime.now()
-        duration = (end - generation_state["start_time"]).total_seconds()
-    
-    return JSONResponse(content={
-        "status": generation_state["status"],
-        "progress": generation_state["progress"],
-        "message": generation_state["message"],
-        "logs": generation_state["logs"][-20:],
-        "error": generation_state["error"],
+    if generation_state.start_time:
+        end = generation_state.end_time or datetime.now()
+        duration = (end - generation_state.start_time).total_seconds()
+    
+    return ORJSONResponse(content={
+        "status": generation_state.status,
+        "progress": generation_state.progress,
+        "message": generation_state.message,
+        "logs": list(islice(logs, max(len(logs) - 20, 0), None)),
+        "error": generation_state.error,
         "duration_seconds": duration
-    })
+    }, headers=headers)
 
 @app.get("/status")
 async def get_status():
     """Get simple status."""
-    return JSONResponse(content={
-        "status": generation_state["status"],
-        "progress": generation_state["progress"],
-        "message": generation_state["message"]
+    return ORJSONResponse(content={
+        "status": generation_state.status,
+        "progress": generation_state.progress,
+        "message": generation_state.message
     })
 
 @app.get("/files")
 async def list_uploaded_files():
     """List all uploaded PDF files."""
+    global _files_cache
+    
     if not BOOKS_DIR.exists():
-        return JSONResponse(content={"files": []})
+        return ORJSONResponse(content={"files": []})
     
-    files = []
-    for pdf_file in BOOKS_DIR.glob("*.pdf"):
-        stat = pdf_file.stat()
-        files.append({
-            "filename": pdf_file.name,
-            "size": stat.st_size,
-            "size_mb": round(stat.st_size / (1024 * 1024), 2),
-            "modified": datetime.fromtimestamp(stat.st_mtime).isoformat()
-        })
+    # Reuse the last listing while the directory is unchanged
+    dir_mtime = BOOKS_DIR.stat().st_mtime_ns
+    if _files_cache is None or _files_cache[0] != dir_mtime:
+        _files_cache = (dir_mtime, list_book_files())
+    files = _files_cache[1]
     
-    return JSONResponse(content={"files": files, "total": len(files)})
+    return ORJSONResponse(content={"files": files, "total": len(files)})
 
 
 # ============================================================================
@@ -490,16 +842,18 @@ async def review_question(request: ReviewRequest):
         }
         
         result = reviewer.review_question(question_data)
-        return JSONResponse(content=result)
+        return ORJSONResponse(content=result)
         
     except Exception as e:
         logger.error(f"Review error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.patch("/update-question/{question_id}")
-async def update_question(question_id: int, update: QuestionUpdate):
+async def update_question(question_id: int, update: QuestionUpdate, background_tasks: BackgroundTasks):
     """Update a specific question in the dataset."""
-    questions = load_questions()
+    global _questions_revision, _questions_save_pending
+    
+    questions = await asyncio.to_thread(load_questions)
     
     if question_id < 0 or question_id >= len(questions):
         raise HTTPException(status_code=404, detail="Question not found")
@@ -519,12 +873,16 @@ async def update_question(question_id: int, update: QuestionUpdate):
         questions[question_id]["difficulty"] = update.difficulty
     
     # Add metadata
-    questions[question_id]["last_updated"] = datetime.now().isoformat()
+    questions[question_id]["last_updated"] = datetime.now()
     questions[question_id]["updated_by_reviewer"] = True
     
-    save_questions(questions)
+    # Edits are applied to the in-memory list; one delayed write covers a burst of them
+    _questions_revision += 1
+    if not _questions_save_pending:
+        _questions_save_pending = True
+        background_tasks.add_task(flush_questions_later)
     
-    return JSONResponse(content={
+    return ORJSONResponse(content={
         "success": True,
         "message": "Question updated successfully",
         "question": questions[question_id]
@@ -551,7 +909,7 @@ async def signup(request: SignupRequest):
             # Create user profile in user_manager
             user_manager.login(request.username)
         
-        return JSONResponse(content=result)
+        return ORJSONResponse(content=result)
     except Exception as e:
         logger.error(f"Signup error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -570,7 +928,7 @@ async def login(request: LoginRequest):
             # Ensure user profile exists
             user_manager.login(result["user"]["username"])
         
-        return JSONResponse(content=result)
+        return ORJSONResponse(content=result)
     except Exception as e:
         logger.error(f"Login error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -579,14 +937,14 @@ async def login(request: LoginRequest):
 async def verify_session(request: SessionVerifyRequest):
     """Verify if session token is valid."""
     result = auth_manager.verify_session(request.session_token)
-    return JSONResponse(content=result)
+    return ORJSONResponse(content=result)
 
 @app.post("/auth/logout")
 async def logout(request: SessionVerifyRequest):
     """Logout user and invalidate session."""
     result = auth_manager.logout(request.session_token)
     current_session["user"] = None
-    return JSONResponse(content=result)
+    return ORJSONResponse(content=result)
 
 # Legacy endpoints for backward compatibility
 @app.post("/login")
@@ -597,20 +955,20 @@ async def legacy_login(request: dict):
         result = user_manager.login(request["username"])
         if result["success"]:
             current_session["user"] = request["username"]
-        return JSONResponse(content=result)
-    return JSONResponse(content={"success": False, "error": "Invalid request"})
+        return ORJSONResponse(content=result)
+    return ORJSONResponse(content={"success": False, "error": "Invalid request"})
 
 @app.post("/logout")
 async def legacy_logout():
     """Legacy logout endpoint."""
     current_session["user"] = None
-    return JSONResponse(content={"success": True, "message": "Logged out successfully"})
+    return ORJSONResponse(content={"success": True, "message": "Logged out successfully"})
 
 @app.get("/sessions")
 async def get_user_sessions(username: str, limit: int = 50):
     """Get user's generation history."""
     sessions = user_manager.get_sessions(username, limit)
-    return JSONResponse(content={"username": username, "sessions": sessions, "total": len(sessions)})
+    return ORJSONResponse(content={"username": username, "sessions": sessions, "total": len(sessions)})
 
 @app.get("/user-stats")
 async def get_user_stats(username: str):
@@ -618,53 +976,63 @@ async def get_user_stats(username: str):
     stats = user_manager.get_stats(username)
     if not stats:
         raise HTTPException(status_code=404, detail="User not found")
-    return JSONResponse(content=stats)
+    return ORJSONResponse(content=stats)
 
 
 # ============================================================================
 # EXPORT/IMPORT ENDPOINTS (Phase 9)
 # ============================================================================
 
-@app.get("/export")
-async def export_questions():
-    """Export questions JSON file."""
-    if not QUESTIONS_FILE.exists():
+async def questions_file_response() -> FileResponse:
+    """
+    Build a file response for the questions JSON file.
+    Edits still waiting on the save delay are written first so the file is current.
+    The stat result is passed along so the response doesn't stat the file again.
+    """
+    await save_pending_questions()
+    
+    try:
+        stat_result = QUESTIONS_FILE.stat()
+    except FileNotFoundError:
         raise HTTPException(status_code=404, detail="No questions to export")
     
     return FileResponse(
         QUESTIONS_FILE,
         media_type="application/json",
-        filename=f"questions_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        filename=f"questions_export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+        stat_result=stat_result
     )
 
+@app.get("/export")
+async def export_questions():
+    """Export questions JSON file."""
+    return await questions_file_response()
+
 @app.get("/download")
 async def download_questions():
     """Download questions JSON file."""
-    return await export_questions()
+    return await questions_file_response()
 
 @app.post("/import")
 async def import_questions(file: UploadFile = File(...)):
     """Import questions from JSON file."""
     try:
         content = await file.read()
-        imported_questions = json.loads(content)
+        imported_questions = orjson.loads(content)
         
         if not isinstance(imported_questions, list):
             raise HTTPException(status_code=400, detail="Invalid format: expected array of questions")
         
-        # Merge with existing questions
-        existing_questions = load_questions()
-        merged = existing_questions + imported_questions
-        
-        save_questions(merged)
+        # Append to existing questions
+        total_questions = await asyncio.to_thread(append_questions, imported_questions)
         
-        return JSONResponse(content={
+        return ORJSONResponse(content={
             "success": True,
             "message": f"Imported {len(imported_questions)} questions",
-            "total_questions": len(merged)
+            "total_questions": total_questions
         })
         
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid JSON file")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -674,18 +1042,31 @@ async def import_questions(file: UploadFile = File(...)):
 # STATIC FILES (Phase 7 - Production)
 # ============================================================================
 
+# Vite content-hashes the filenames of built assets, so they never change in place
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+class CachedStaticFiles(StaticFiles):
+    """Static files served with long-lived cache headers for hashed build assets."""
+    
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
+
 # Serve static frontend build (if exists)
 frontend_dist = Path("frontend/dist")
 if frontend_dist.exists():
-    app.mount("/static", StaticFiles(directory=frontend_dist / "assets"), name="static")
+    app.mount("/static", CachedStaticFiles(directory=frontend_dist / "assets"), name="static")
     
     @app.get("/{full_path:path}")
     async def serve_frontend(full_path: str):
         """Serve React frontend for production."""
         file_path = frontend_dist / full_path
-        if file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
-        return FileResponse(frontend_dist / "index.html")
+        if file_path.is_file():
+            # index.html and other unhashed files are revalidated via their ETag
+            cache_control = IMMUTABLE_CACHE_CONTROL if full_path.startswith("assets/") else "no-cache"
+            return FileResponse(file_path, headers={"Cache-Control": cache_control})
+        return FileResponse(frontend_dist / "index.html", headers={"Cache-Control": "no-cache"})
 
 
 if __name__ == "__main__":
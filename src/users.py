@@ -5,40 +5,99 @@ Simple username-based system for local use (no passwords).
 """
 
 import json
+import sqlite3
+import threading
 from pathlib import Path
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
 
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    total_questions INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL REFERENCES users(username),
+    timestamp TEXT NOT NULL,
+    questions_generated INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_user_time ON sessions(username, timestamp DESC);
+CREATE TABLE IF NOT EXISTS session_topics (
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    username TEXT NOT NULL,
+    topic TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_session_topics_user ON session_topics(username);
+"""
+
+
 class UserManager:
     """
     Manages user profiles and generation history.
-    Stores data in a simple JSON file for local use.
+    Stores data in a local SQLite database so sessions are appended and
+    queried without rewriting the whole store.
     """
     
-    def __init__(self, users_file: str = "output/users.json"):
-        """Initialize user manager with JSON file path."""
+    def __init__(self, users_file: str = "output/users.db"):
+        """
+        Initialize user manager with SQLite database path.
+        An existing JSON store with the same name (users.json) is imported
+        the first time the database is created.
+        """
         self.users_file = Path(users_file)
         self.users_file.parent.mkdir(parents=True, exist_ok=True)
-        self._ensure_file_exists()
-    
-    def _ensure_file_exists(self):
-        """Create users file if it doesn't exist."""
-        if not self.users_file.exists():
-            self._save_users({})
+        
+        is_new = not self.users_file.exists()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.users_file, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL commits append to a log and only sync at checkpoints, so each
+        # session insert doesn't wait on a full fsync of the database
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        
+        legacy_file = self.users_file.with_suffix(".json")
+        if is_new and legacy_file != self.users_file and legacy_file.exists():
+            self._import_legacy_json(legacy_file)
     
-    def _load_users(self) -> Dict[str, Any]:
-        """Load users from JSON file."""
+    def _import_legacy_json(self, legacy_file: Path):
+        """Import users and sessions from the previous JSON file store."""
         try:
-            with open(self.users_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {}
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                users = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return
+        
+        for username, user in users.items():
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO users (username, created_at) VALUES (?, ?)",
+                    (username, user.get('created_at') or datetime.now().isoformat())
+                )
+            for session in user.get('sessions', []):
+                self.add_session(username, session)
+    
+    def _user_row_to_dict(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """Build the user data dictionary for a users table row."""
+        return {
+            "created_at": row["created_at"],
+            "sessions": self._query_sessions(
+                "SELECT data FROM sessions WHERE username = ? ORDER BY id",
+                (row["username"],)
+            ),
+            "total_questions": row["total_questions"]
+        }
     
-    def _save_users(self, users: Dict[str, Any]):
-        """Save users to JSON file."""
-        with open(self.users_file, 'w', encoding='utf-8') as f:
-            json.dump(users, f, ensure_ascii=False, indent=2)
+    def _query_sessions(self, sql: str, params: tuple) -> List[Dict[str, Any]]:
+        """Run a query selecting session data and decode the results."""
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row["data"]) for row in rows]
     
     def login(self, username: str) -> Dict[str, Any]:
         """
@@ -46,7 +105,7 @@ class UserManager:
         
         Args:
             username: Username to login with
-            
+        
         Returns:
             User data dictionary
         """
@@ -57,27 +116,27 @@ class UserManager:
             }
         
         username = username.strip()
-        users = self._load_users()
         
         # Create user if doesn't exist
-        if username not in users:
-            users[username] = {
-                "created_at": datetime.now().isoformat(),
-                "sessions": [],
-                "total_questions": 0
-            }
-            self._save_users(users)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO users (username, created_at) VALUES (?, ?)",
+                (username, datetime.now().isoformat())
+            )
         
         return {
             "success": True,
             "username": username,
-            "user_data": users[username]
+            "user_data": self.get_user(username)
         }
     
     def get_user(self, username: str) -> Optional[Dict[str, Any]]:
         """Get user data."""
-        users = self._load_users()
-        return users.get(username)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM users WHERE username = ?", (username,)
+            ).fetchone()
+        return self._user_row_to_dict(row) if row else None
     
     def add_session(self, username: str, session_data: Dict[str, Any]):
         """
@@ -87,19 +146,38 @@ class UserManager:
             username: Username
             session_data: Session information (topics, questions, timestamp, etc.)
         """
-        users = self._load_users()
-        
-        if username not in users:
-            return
-        
         # Add timestamp if not present
         if 'timestamp' not in session_data:
             session_data['timestamp'] = datetime.now().isoformat()
         
-        users[username]['sessions'].append(session_data)
-        users[username]['total_questions'] = users[username].get('total_questions', 0) + session_data.get('questions_generated', 0)
+        topics = session_data.get('topics', [])
+        if isinstance(topics, str):
+            topics = [topics]
+        elif not isinstance(topics, list):
+            topics = []
+        
+        questions_generated = session_data.get('questions_generated', 0)
         
-        self._save_users(users)
+        with self._lock, self._conn:
+            exists = self._conn.execute(
+                "SELECT 1 FROM users WHERE username = ?", (username,)
+            ).fetchone()
+            if not exists:
+                return
+            
+            cursor = self._conn.execute(
+                "INSERT INTO sessions (username, timestamp, questions_generated, data) VALUES (?, ?, ?, ?)",
+                (username, session_data['timestamp'], questions_generated,
+                 json.dumps(session_data, ensure_ascii=False))
+            )
+            self._conn.executemany(
+                "INSERT INTO session_topics (session_id, username, topic) VALUES (?, ?, ?)",
+                [(cursor.lastrowid, username, topic) for topic in topics]
+            )
+            self._conn.execute(
+                "UPDATE users SET total_questions = total_questions + ? WHERE username = ?",
+                (questions_generated, username)
+            )
     
     def get_sessions(self, username: str, limit: int = 50) -> List[Dict[str, Any]]:
         """
@@ -108,21 +186,21 @@ class UserManager:
         Args:
             username: Username
             limit: Maximum number of sessions to return
-            
+        
         Returns:
             List of session dictionaries
         """
-        user = self.get_user(username)
-        if not user:
-            return []
-        
-        sessions = user.get('sessions', [])
         # Return most recent sessions first
-        return sorted(sessions, key=lambda x: x.get('timestamp', ''), reverse=True)[:limit]
+        return self._query_sessions(
+            "SELECT data FROM sessions WHERE username = ? ORDER BY timestamp DESC, id LIMIT ?",
+            (username, limit)
+        )
     
     def get_all_users(self) -> Dict[str, Any]:
         """Get all users."""
-        return self._load_users()
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM users").fetchall()
+        return {row["username"]: self._user_row_to_dict(row) for row in rows}
     
     def get_stats(self, username: str) -> Dict[str, Any]:
         """
@@ -130,42 +208,49 @@ class UserManager:
         
         Args:
             username: Username
-            
+        
         Returns:
             Statistics dictionary
         """
-        user = self.get_user(username)
-        if not user:
-            return {}
-        
-        sessions = user.get('sessions', [])
-        
-        # Calculate stats
-        total_sessions = len(sessions)
-        total_questions = sum(s.get('questions_generated', 0) for s in sessions)
-        topics_used = set()
+        with self._lock:
+            user = self._conn.execute(
+                "SELECT created_at FROM users WHERE username = ?", (username,)
+            ).fetchone()
+            if not user:
+                return {}
+            
+            # Aggregate in SQLite rather than over decoded sessions
+            total_sessions, total_questions = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(questions_generated), 0) FROM sessions WHERE username = ?",
+                (username,)
+            ).fetchone()
+            topics_used = [
+                row["topic"] for row in self._conn.execute(
+                    "SELECT DISTINCT topic FROM session_topics WHERE username = ?", (username,)
+                )
+            ]
         
-        for session in sessions:
-            topics = session.get('topics', [])
-            if isinstance(topics, list):
-                topics_used.update(topics)
-            elif isinstance(topics, str):
-                topics_used.add(topics)
+        latest = self.get_sessions(username, limit=1)
         
         return {
             "username": username,
             "total_sessions": total_sessions,
             "total_questions_generated": total_questions,
             "unique_topics": len(topics_used),
-            "topics_list": list(topics_used),
-            "created_at": user.get('created_at'),
-            "latest_session": sessions[0] if sessions else None
+            "topics_list": topics_used,
+            "created_at": user["created_at"],
+            "latest_session": latest[0] if latest else None
         }
+    
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
 
 
 if __name__ == "__main__":
     # Test user management
-    manager = UserManager("output/users.json")
+    manager = UserManager("output/users.db")
     
     # Test login
     result = manager.login("test_user")
@@ -185,4 +270,3 @@ if __name__ == "__main__":
     # Test stats
     stats = manager.get_stats("test_user")
     print(f"Stats: {stats}")
-
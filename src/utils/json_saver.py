@@ -3,11 +3,18 @@ JSON Saver Module - Phase 3
 Saves question data to JSON files with validation and proper formatting.
 """
 
-import json
+import orjson
+from collections import Counter
 from pathlib import Path
 from typing import List, Dict, Any
 
 
+# Structure checks, as frozensets so each one is a single set operation
+_REQUIRED_FIELDS = frozenset(["question", "options", "answer", "category", "difficulty", "explanation"])
+_REQUIRED_OPTIONS = frozenset(["A", "B", "C", "D"])
+_VALID_DIFFICULTIES = frozenset(["easy", "medium", "hard", "Easy", "Medium", "Hard"])
+
+
 def validate_question_structure(question: Dict[str, Any]) -> bool:
     """
     Validate that a question has all required fields and proper structure.
@@ -18,27 +25,23 @@ def validate_question_structure(question: Dict[str, Any]) -> bool:
     Returns:
         True if valid, False otherwise
     """
-    required_fields = ["question", "options", "answer", "category", "difficulty", "explanation"]
-    
     # Check all required fields exist
-    if not all(field in question for field in required_fields):
+    if not question.keys() >= _REQUIRED_FIELDS:
         return False
     
     # Validate options is a dict with A, B, C, D
-    if not isinstance(question["options"], dict):
-        return False
-    
-    required_options = ["A", "B", "C", "D"]
-    if not all(opt in question["options"] for opt in required_options):
+    options = question["options"]
+    if not isinstance(options, dict) or not options.keys() >= _REQUIRED_OPTIONS:
         return False
     
     # Validate answer is one of the options
-    if question["answer"] not in required_options:
+    answer = question["answer"]
+    if not isinstance(answer, str) or answer not in _REQUIRED_OPTIONS:
         return False
     
     # Validate difficulty is one of the expected values
-    valid_difficulties = ["easy", "medium", "hard", "Easy", "Medium", "Hard"]
-    if question["difficulty"] not in valid_difficulties:
+    difficulty = question["difficulty"]
+    if not isinstance(difficulty, str) or difficulty not in _VALID_DIFFICULTIES:
         return False
     
     return True
@@ -91,13 +94,10 @@ def save_questions_to_json(
     
     # Save to file
     try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(
-                questions, 
-                f, 
-                ensure_ascii=False,  # Allow UTF-8 characters
-                indent=2
-            )
+        # orjson writes UTF-8 bytes directly (non-ASCII characters kept as-is)
+        output_file.write_bytes(
+            orjson.dumps(questions, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        )
         
         file_size = output_file.stat().st_size
         
@@ -153,8 +153,7 @@ def load_questions(input_file: str) -> List[Dict[str, Any]]:
         raise FileNotFoundError(f"File not found: {input_file}")
     
     try:
-        with open(input_path, 'r', encoding='utf-8') as f:
-            questions = json.load(f)
+        questions = orjson.loads(input_path.read_bytes())
         
         if not isinstance(questions, list):
             raise ValueError("Invalid format: expected a list of questions")
@@ -183,21 +182,13 @@ def get_question_stats(questions: List[Dict[str, Any]]) -> Dict[str, Any]:
             "by_difficulty": {}
         }
     
+    # Counter does the per-item counting in C
     stats = {
         "total": len(questions),
-        "by_category": {},
-        "by_difficulty": {}
+        "by_category": dict(Counter(q.get("category", "Unknown") for q in questions)),
+        "by_difficulty": dict(Counter(q.get("difficulty", "Unknown") for q in questions))
     }
     
-    for q in questions:
-        # Count by category
-        category = q.get("category", "Unknown")
-        stats["by_category"][category] = stats["by_category"].get(category, 0) + 1
-        
-        # Count by difficulty
-        difficulty = q.get("difficulty", "Unknown")
-        stats["by_difficulty"][difficulty] = stats["by_difficulty"].get(difficulty, 0) + 1
-    
     return stats
 
 
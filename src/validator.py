@@ -6,17 +6,67 @@ Implements duplicate detection, schema validation, and data normalization.
 
 import re
 import json
-import difflib
+import math
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import List, Dict, Any, Set, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple
 from collections import Counter
 from datetime import datetime
 from tqdm import tqdm
+from rapidfuzz import process
+from rapidfuzz.distance import Indel
 
 
 # Validation report file path
 VALIDATION_REPORT_PATH = "output/validation_report.txt"
 
+# Questions handed to each worker process at a time when validating in parallel
+WORKER_CHUNK_SIZE = 1000
+
+# Patterns used on every question, compiled once
+_PUNCT_RE = re.compile(r'[^\w\s]')
+_HAS_LETTER_RE = re.compile(r'[a-zA-Z]')
+# Timestamp line of the validation report, ignored when comparing reports
+_REPORT_TIMESTAMP_RE = re.compile(r'^Generated: .*$', re.MULTILINE)
+
+# Fields every question must have
+_REQUIRED_FIELDS = frozenset(["question", "options", "answer", "category", "difficulty", "explanation"])
+
+# Option keys every question must have, and so the valid answers
+_OPTION_KEYS = ("A", "B", "C", "D")
+_VALID_ANSWERS = frozenset(_OPTION_KEYS)
+
+# Accepted difficulty spellings and the level each maps to
+DIFFICULTY_LEVELS = {
+    "easy": "Easy",
+    "medium": "Medium",
+    "hard": "Hard",
+    "intermediate": "Medium",
+    "difficult": "Hard",
+    "simple": "Easy",
+    "basic": "Easy",
+    "advanced": "Hard",
+    "challenging": "Hard"
+}
+
+
+class _PunctuationTable(dict):
+    """
+    str.translate table deleting every character that is neither a word
+    character nor whitespace. Entries are filled in the first time a
+    character is seen, so any Unicode punctuation is covered.
+    """
+    
+    def __missing__(self, code: int):
+        value = None if _PUNCT_RE.match(chr(code)) else code
+        self[code] = value
+        return value
+
+
+_PUNCT_TABLE = _PunctuationTable()
+
 
 class QuestionValidator:
     """
@@ -33,6 +83,15 @@ class QuestionValidator:
         """
         self.report_path = report_path
         self.seen_questions: Set[str] = set()
+        # Question texts exactly as received, so verbatim repeats are caught
+        # before normalization
+        self._seen_raw: Set[str] = set()
+        # Normalized seen questions sorted by length, so fuzzy matching only
+        # compares against questions whose length allows a match
+        self._seen_texts: List[str] = []
+        self._seen_lengths: List[int] = []
+        # Normalized form of each category seen; a batch only has a handful
+        self._category_titles: Dict[str, str] = {}
         self.stats = {
             "total_input": 0,
             "total_output": 0,
@@ -48,6 +107,18 @@ class QuestionValidator:
         # Ensure report directory exists
         Path(report_path).parent.mkdir(parents=True, exist_ok=True)
     
+    def _normalize_words(self, text: str) -> List[str]:
+        """
+        Split text into normalized words: lowercase, without punctuation.
+        
+        Args:
+            text: Text to normalize
+            
+        Returns:
+            List of words
+        """
+        return text.lower().translate(_PUNCT_TABLE).split()
+    
     def _normalize_text(self, text: str) -> str:
         """
         Normalize text for comparison.
@@ -59,13 +130,7 @@ class QuestionValidator:
         Returns:
             Normalized text
         """
-        # Convert to lowercase
-        text = text.lower()
-        # Remove punctuation
-        text = re.sub(r'[^\w\s]', '', text)
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text
+        return ' '.join(self._normalize_words(text))
     
     def _is_duplicate(self, question_text: str, threshold: float = 0.85) -> bool:
         """
@@ -78,20 +143,38 @@ class QuestionValidator:
         Returns:
             True if duplicate, False otherwise
         """
+        # Verbatim repeat of a question already accepted
+        if question_text in self._seen_raw:
+            return True
+        
         normalized = self._normalize_text(question_text)
         
         # Quick exact match check
         if normalized in self.seen_questions:
             return True
         
-        # Fuzzy match against existing questions
-        for seen_q in self.seen_questions:
-            similarity = difflib.SequenceMatcher(None, normalized, seen_q).ratio()
-            if similarity >= threshold:
-                return True
+        # The similarity 2 * common / (la + lb) can't reach the threshold unless
+        # the shorter text is at least threshold / (2 - threshold) of the longer
+        # one, so only that range of lengths is compared (floor/ceil keep the
+        # range from shrinking through float error)
+        length = len(normalized)
+        lo = bisect_left(self._seen_lengths, math.floor(length * threshold / (2 - threshold)))
+        hi = bisect_right(self._seen_lengths, math.ceil(length * (2 - threshold) / threshold))
+        # rapidfuzz's cutoff can reject a score exactly at the threshold, so it
+        # gets a little slack and the threshold is checked on the best score
+        match = process.extractOne(
+            normalized, self._seen_texts[lo:hi],
+            scorer=Indel.normalized_similarity, score_cutoff=threshold - 0.01
+        )
+        if match and match[1] >= threshold:
+            return True
         
-        # Not a duplicate - add to seen set
+        # Not a duplicate - add to seen sets, keeping the length order
+        idx = bisect_right(self._seen_lengths, length)
+        self._seen_raw.add(question_text)
         self.seen_questions.add(normalized)
+        self._seen_texts.insert(idx, normalized)
+        self._seen_lengths.insert(idx, length)
         return False
     
     def _validate_schema(self, question: Dict[str, Any]) -> bool:
@@ -104,9 +187,7 @@ class QuestionValidator:
         Returns:
             True if valid schema, False otherwise
         """
-        required_fields = ["question", "options", "answer", "category", "difficulty", "explanation"]
-        
-        if not all(field in question for field in required_fields):
+        if not question.keys() >= _REQUIRED_FIELDS:
             self.stats["missing_keys"] += 1
             return False
         
@@ -156,21 +237,17 @@ class QuestionValidator:
             self.stats["invalid_options"] += 1
             return False
         
-        required_keys = ["A", "B", "C", "D"]
-        if not all(key in options for key in required_keys):
-            self.stats["invalid_options"] += 1
-            return False
-        
-        # Check for empty options
-        for key in required_keys:
-            if not options[key] or not str(options[key]).strip():
+        # Check A-D are present, non-empty and distinct in one pass
+        seen_values = set()
+        for key in _OPTION_KEYS:
+            value = options.get(key)
+            if not value or not str(value).strip() or value in seen_values:
                 self.stats["invalid_options"] += 1
                 return False
+            seen_values.add(value)
         
-        # Remove duplicate options
-        option_values = list(options.values())
-        if len(option_values) != len(set(option_values)):
-            # Has duplicates - this is invalid
+        # Any extra options must not repeat a value either
+        if len(options) > len(seen_values) and len(set(options.values())) != len(options):
             self.stats["invalid_options"] += 1
             return False
         
@@ -188,41 +265,42 @@ class QuestionValidator:
             True if valid/fixed, False if unfixable
         """
         answer = question.get("answer", "")
-        options = question.get("options", {})
         
-        # Normalize answer (could be "A", "a", "Option A", etc.)
+        # Answer is already a valid key (the usual case)
+        if answer in _VALID_ANSWERS:
+            return True
+        
+        # Normalize answer (could be "a", " B ", etc.)
         answer_clean = answer.strip().upper()
         
         # Check if answer is a valid key (A, B, C, D)
-        if answer_clean in ["A", "B", "C", "D"]:
+        if answer_clean in _VALID_ANSWERS:
             question["answer"] = answer_clean
             return True
         
         # Try to find the answer in option values
-        option_values = {k: v for k, v in options.items()}
+        option_values = question.get("options", {})
         
         # Try exact match
+        answer_lower = answer.strip().lower()
         for key, value in option_values.items():
-            if str(value).strip().lower() == answer.strip().lower():
+            if str(value).strip().lower() == answer_lower:
                 question["answer"] = key
                 self.stats["auto_corrected"] += 1
                 return True
         
-        # Try fuzzy match
-        matches = difflib.get_close_matches(
-            answer, 
-            [str(v) for v in option_values.values()], 
-            n=1, 
-            cutoff=0.8
+        # Try fuzzy match; given a mapping, extractOne also returns the key
+        match = process.extractOne(
+            answer,
+            {key: str(value) for key, value in option_values.items()},
+            scorer=Indel.normalized_similarity,
+            score_cutoff=0.8
         )
         
-        if matches:
-            # Find the key for this value
-            for key, value in option_values.items():
-                if str(value) == matches[0]:
-                    question["answer"] = key
-                    self.stats["auto_corrected"] += 1
-                    return True
+        if match:
+            question["answer"] = match[2]
+            self.stats["auto_corrected"] += 1
+            return True
         
         # Couldn't fix
         self.stats["invalid_answer"] += 1
@@ -237,7 +315,10 @@ class QuestionValidator:
         """
         category = question.get("category", "")
         if category:
-            question["category"] = category.strip().title()
+            title = self._category_titles.get(category)
+            if title is None:
+                title = self._category_titles[category] = category.strip().title()
+            question["category"] = title
     
     def _normalize_difficulty(self, question: Dict[str, Any]) -> bool:
         """
@@ -252,20 +333,8 @@ class QuestionValidator:
         """
         difficulty = question.get("difficulty", "").strip().lower()
         
-        valid_difficulties = {
-            "easy": "Easy",
-            "medium": "Medium",
-            "hard": "Hard",
-            "intermediate": "Medium",
-            "difficult": "Hard",
-            "simple": "Easy",
-            "basic": "Easy",
-            "advanced": "Hard",
-            "challenging": "Hard"
-        }
-        
-        if difficulty in valid_difficulties:
-            question["difficulty"] = valid_difficulties[difficulty]
+        if difficulty in DIFFICULTY_LEVELS:
+            question["difficulty"] = DIFFICULTY_LEVELS[difficulty]
             return True
         
         # Default to Medium if unrecognized
@@ -285,28 +354,24 @@ class QuestionValidator:
         q_text = question.get("question", "")
         
         # Question starts with punctuation
-        if q_text.startswith("?") or q_text.startswith("."):
+        if q_text.startswith(("?", ".")):
             self.stats["factual_issues"] += 1
             return False
         
-        # Question is only numbers
-        if q_text.strip().replace(" ", "").isdigit():
-            self.stats["factual_issues"] += 1
-            return False
-        
-        # Question has no letters
-        if not re.search(r'[a-zA-Z]', q_text):
+        # Question has no letters (this also rejects questions that are only numbers)
+        if not _HAS_LETTER_RE.search(q_text):
             self.stats["factual_issues"] += 1
             return False
         
         return True
     
-    def validate_question(self, question: Dict[str, Any]) -> bool:
+    def _check_question(self, question: Dict[str, Any]) -> bool:
         """
-        Validate a single question through all checks.
+        Run the checks that look at a question on its own, i.e. everything
+        except duplicate detection.
         
         Args:
-            question: Question dictionary
+            question: Question dictionary (modified in place)
             
         Returns:
             True if valid, False if should be filtered
@@ -319,6 +384,11 @@ class QuestionValidator:
         if not self._validate_text_length(question):
             return False
         
+        # Factual issues (cheap text checks, run before the options and
+        # answer checks that may fix up the question)
+        if not self._check_factual_issues(question):
+            return False
+        
         # Options validation
         if not self._validate_and_fix_options(question):
             return False
@@ -327,10 +397,19 @@ class QuestionValidator:
         if not self._validate_and_fix_answer(question):
             return False
         
-        # Factual issues
-        if not self._check_factual_issues(question):
-            return False
+        return True
+    
+    def _accept_question(self, question: Dict[str, Any]) -> bool:
+        """
+        Check a question that passed _check_question against the questions
+        accepted so far, and normalize it if it is new.
         
+        Args:
+            question: Question dictionary (modified in place)
+            
+        Returns:
+            True if accepted, False if it duplicates an earlier question
+        """
         # Duplicate detection
         if self._is_duplicate(question["question"]):
             self.stats["duplicates"] += 1
@@ -342,32 +421,121 @@ class QuestionValidator:
         
         return True
     
-    def validate_questions(self, questions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def validate_question(self, question: Dict[str, Any]) -> bool:
+        """
+        Validate a single question through all checks.
+        
+        Args:
+            question: Question dictionary
+            
+        Returns:
+            True if valid, False if should be filtered
+        """
+        return self._check_question(question) and self._accept_question(question)
+    
+    def _check_questions_parallel(self, questions: List[Dict[str, Any]], workers: int) -> List[Dict[str, Any]]:
+        """
+        Run _check_question over chunks of questions in worker processes and
+        add the workers' drop counts to this validator's stats.
+        
+        Args:
+            questions: List of question dictionaries
+            workers: Number of worker processes
+            
+        Returns:
+            Questions that passed, as corrected copies returned by the workers
+        """
+        chunks = [questions[i:i + WORKER_CHUNK_SIZE] for i in range(0, len(questions), WORKER_CHUNK_SIZE)]
+        checked = []
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for passed, chunk_stats in executor.map(_check_chunk, chunks, repeat(self.report_path)):
+                checked.extend(passed)
+                for key, value in chunk_stats.items():
+                    self.stats[key] += value
+        return checked
+    
+    def validate_questions(self, questions: List[Dict[str, Any]], workers: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Validate and clean a list of questions.
         
         Args:
             questions: List of question dictionaries
+            workers: Number of processes for the per-question checks; they run
+                in this process when None or 1. Duplicate detection always runs
+                here, and with several workers the returned questions are
+                corrected copies rather than the input dictionaries.
             
         Returns:
             List of validated and cleaned questions
         """
-        self.stats["total_input"] = len(questions)
+        self._start_run(len(questions))
+        
+        # Per-question checks first, then duplicate detection over the
+        # questions that passed, in input order
+        if workers and workers > 1 and len(questions) > WORKER_CHUNK_SIZE:
+            checked = self._check_questions_parallel(questions, workers)
+        else:
+            checked = [question for question in questions if self._check_question(question)]
+        validated = [question for question in checked if self._accept_question(question)]
+        
+        self._finish_run(len(validated))
+        return validated
+    
+    def iter_validate_questions(self, questions: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """
+        Validate and clean questions one at a time, yielding each valid question.
+        Lets callers stream questions through validation without building a
+        list of the results. Stats and the report cover the questions consumed
+        once the generator is exhausted or closed.
+        
+        Args:
+            questions: Iterable of question dictionaries
+            
+        Yields:
+            Validated and cleaned questions
+        """
+        self._start_run(None)
+        total_output = 0
+        try:
+            for question in questions:
+                self.stats["total_input"] += 1
+                if self.validate_question(question):
+                    total_output += 1
+                    yield question
+        finally:
+            self._finish_run(total_output)
+    
+    def _start_run(self, total_input: Optional[int]) -> None:
+        """
+        Reset stats and seen questions before validating a new set of questions.
+        
+        Args:
+            total_input: Number of questions, if known up front
+        """
+        self.stats = dict.fromkeys(self.stats, 0)
+        self.stats["total_input"] = total_input or 0
         self.seen_questions.clear()
+        self._seen_raw.clear()
+        self._seen_texts.clear()
+        self._seen_lengths.clear()
         
         print("\n" + "=" * 70)
         print("PHASE 4: QUESTION VALIDATION & QUALITY CONTROL")
         print("=" * 70)
-        print(f"Validating {len(questions):,} generated questions...")
+        if total_input is None:
+            print("Validating generated questions...")
+        else:
+            print(f"Validating {total_input:,} generated questions...")
         print()
+    
+    def _finish_run(self, total_output: int) -> None:
+        """
+        Record the output count, write the report and print the summary.
         
-        validated = []
-        
-        for question in questions:
-            if self.validate_question(question):
-                validated.append(question)
-        
-        self.stats["total_output"] = len(validated)
+        Args:
+            total_output: Number of questions retained
+        """
+        self.stats["total_output"] = total_output
         
         # Generate report
         self._generate_report()
@@ -380,13 +548,16 @@ class QuestionValidator:
         print(f"  Auto-corrected answers: {self.stats['auto_corrected']}")
         print(f"  Validation report: {self.report_path}")
         print()
-        
-        return validated
     
     def _generate_report(self) -> None:
         """
         Generate a detailed validation report.
+        Skipped for runs that saw no questions, and when the report on disk
+        already matches apart from its timestamp.
         """
+        if self.stats["total_input"] == 0:
+            return
+        
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
         report = f"""
@@ -425,6 +596,13 @@ VALIDATION CHECKS PERFORMED:
 {'=' * 70}
 """
         
+        try:
+            existing = Path(self.report_path).read_text(encoding='utf-8')
+        except (OSError, UnicodeDecodeError):
+            existing = None
+        if existing is not None and _REPORT_TIMESTAMP_RE.sub('', existing) == _REPORT_TIMESTAMP_RE.sub('', report):
+            return
+        
         try:
             with open(self.report_path, 'w', encoding='utf-8') as f:
                 f.write(report)
@@ -432,7 +610,27 @@ VALIDATION CHECKS PERFORMED:
             print(f"[WARNING] Could not write validation report: {e}")
 
 
-def validate_questions(questions: List[Dict[str, Any]], report_path: str = VALIDATION_REPORT_PATH) -> List[Dict[str, Any]]:
+def _check_chunk(questions: List[Dict[str, Any]], report_path: str) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Run the per-question checks on a chunk of questions in a worker process.
+    
+    Args:
+        questions: List of question dictionaries
+        report_path: Report path of the calling validator
+        
+    Returns:
+        Tuple of (questions that passed, stats counted for this chunk)
+    """
+    validator = QuestionValidator(report_path)
+    passed = [question for question in questions if validator._check_question(question)]
+    return passed, validator.stats
+
+
+def validate_questions(
+    questions: List[Dict[str, Any]],
+    report_path: str = VALIDATION_REPORT_PATH,
+    workers: Optional[int] = None
+) -> List[Dict[str, Any]]:
     """
     Validate and clean a list of questions.
     Convenience function that creates a validator and processes questions.
@@ -440,12 +638,13 @@ def validate_questions(questions: List[Dict[str, Any]], report_path: str = VALID
     Args:
         questions: List of question dictionaries
         report_path: Path to validation report file
+        workers: Number of processes for the per-question checks (default: run in this process)
         
     Returns:
         List of validated and cleaned questions
     """
     validator = QuestionValidator(report_path)
-    return validator.validate_questions(questions)
+    return validator.validate_questions(questions, workers=workers)
 
 
 if __name__ == "__main__":
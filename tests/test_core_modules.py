@@ -3,17 +3,22 @@ Comprehensive Tests for Question Generator AI - Phase 10
 Tests core modules: parser, chunker, generator, validator, quality_scorer, reviewer, users
 """
 
+import asyncio
+import json
 import unittest
 import sys
+import tempfile
+from unittest import mock
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from chunker import chunk_text
-from validator import validate_questions
+from validator import validate_questions, QuestionValidator
 from quality_scorer import score_all_questions
 from users import UserManager
+from utils.json_saver import save_questions_to_json, load_questions, get_question_stats
 
 
 class TestChunker(unittest.TestCase):
@@ -97,6 +102,110 @@ class TestValidator(unittest.TestCase):
         
         validated = validate_questions(questions)
         self.assertEqual(len(validated), 1)  # Only one should remain
+    
+    def test_validator_reuse_resets_stats(self):
+        """Test that a second run on one validator counts only its own questions."""
+        questions = [
+            {
+                "question": "What is the capital of France?",
+                "options": {"A": "Paris", "B": "London", "C": "Berlin", "D": "Rome"},
+                "answer": "A",
+                "category": "Geography",
+                "difficulty": "Easy",
+                "explanation": "Paris is the capital."
+            },
+            {"question": "Incomplete?"}
+        ]
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report_path = Path(temp_dir) / "report.txt"
+            validator = QuestionValidator(str(report_path))
+            validator.validate_questions(questions)
+            first_stats = dict(validator.stats)
+            
+            # Mark the report; an unchanged run must leave it in place
+            report = report_path.read_text(encoding='utf-8')
+            report_path.write_text(report.replace("Generated: ", "Generated: earlier "), encoding='utf-8')
+            validator.validate_questions(questions)
+            self.assertEqual(validator.stats, first_stats)
+            self.assertEqual(validator.stats["missing_keys"], 1)
+            self.assertIn("Generated: earlier ", report_path.read_text(encoding='utf-8'))
+            
+            validator.validate_questions(questions[:1])
+            self.assertEqual(validator.stats["missing_keys"], 0)
+            self.assertNotIn("Generated: earlier ", report_path.read_text(encoding='utf-8'))
+    
+    def test_validate_near_duplicate_detection(self):
+        """Test that reworded near-duplicates are filtered but distinct questions kept."""
+        base = {
+            "options": {"A": "Paris", "B": "London", "C": "Berlin", "D": "Rome"},
+            "answer": "A",
+            "category": "Geography",
+            "difficulty": "Easy",
+            "explanation": "Paris is the capital."
+        }
+        questions = [
+            {**base, "question": "What is the capital of France?"},
+            {**base, "question": "What is the capital city of France?"},  # Near duplicate
+            {**base, "question": "Which river flows through the city of Paris?"},
+            {**base, "question": "What is the boiling point of water at sea level?"},
+            {**base, "question": "What's the boiling-point of water at sea-level?"},  # Near duplicate
+            {**base, "question": "Which organelle produces energy in the cell?"},
+            {**base, "question": "Which organelles produce energy in cells?"}  # Near duplicate
+        ]
+        
+        validated = validate_questions(questions)
+        self.assertEqual(
+            [q["question"] for q in validated],
+            [
+                "What is the capital of France?",
+                "Which river flows through the city of Paris?",
+                "What is the boiling point of water at sea level?",
+                "Which organelle produces energy in the cell?"
+            ]
+        )
+    
+    def test_validate_parallel_matches_serial(self):
+        """Test that checking questions in worker processes gives the same result."""
+        questions = [
+            {
+                "question": f"In which year did event number {i} of the archive take place?",
+                "options": {"A": "1950", "B": "1960", "C": "1970", "D": "1980" if i % 7 else "1950"},
+                "answer": "b" if i % 3 else "1970",
+                "category": "history",
+                "difficulty": "medium",
+                "explanation": "Recorded in the archive."
+            }
+            for i in range(1500)
+        ]
+        
+        serial = validate_questions([dict(q) for q in questions])
+        parallel = validate_questions([dict(q) for q in questions], workers=2)
+        self.assertEqual(parallel, serial)
+    
+    def test_iter_validate_questions(self):
+        """Test that streaming validation yields the same questions and stats."""
+        base = {
+            "options": {"A": "Paris", "B": "London", "C": "Berlin", "D": "Rome"},
+            "answer": "a",
+            "category": "geography",
+            "difficulty": "easy",
+            "explanation": "Paris is the capital."
+        }
+        questions = [
+            {**base, "question": "What is the capital of France?"},
+            {**base, "question": "What is the capital of France?"},  # Duplicate
+            {**base, "question": "Too short"},
+            {**base, "question": "Which river flows through the city of Paris?"}
+        ]
+        
+        validator = QuestionValidator()
+        expected = validator.validate_questions([dict(q) for q in questions])
+        expected_stats = dict(validator.stats)
+        
+        streamed = list(validator.iter_validate_questions(dict(q) for q in questions))
+        self.assertEqual(streamed, expected)
+        self.assertEqual(validator.stats, expected_stats)
 
 
 class TestQualityScorer(unittest.TestCase):
@@ -157,16 +266,59 @@ class TestQualityScorer(unittest.TestCase):
         self.assertGreaterEqual(scored[0]["quality_score"], scored[1]["quality_score"])
 
 
+class TestJsonSaver(unittest.TestCase):
+    """Test saving and loading question files."""
+    
+    def test_save_and_load_roundtrip(self):
+        """Test that saved questions load back unchanged, including UTF-8 text."""
+        questions = [
+            {
+                "question": "What is the capital of Cameroon?",
+                "options": {"A": "Douala", "B": "Yaoundé", "C": "Buea", "D": "Bamenda"},
+                "answer": "B",
+                "category": "Geography",
+                "difficulty": "Easy",
+                "explanation": "Yaoundé is the political capital."
+            }
+        ]
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_path = Path(tmp_dir) / "questions.json"
+            result = save_questions_to_json(questions, str(output_path))
+            
+            self.assertEqual(result["questions_saved"], 1)
+            self.assertIn("Yaoundé", output_path.read_text(encoding="utf-8"))
+            self.assertEqual(load_questions(str(output_path)), questions)
+    
+    def test_get_question_stats(self):
+        """Test category/difficulty counts, including after the list grows."""
+        questions = [
+            {"category": "Geography", "difficulty": "Easy"},
+            {"category": "History", "difficulty": "Easy"}
+        ]
+        
+        stats = get_question_stats(questions)
+        self.assertEqual(stats["total"], 2)
+        self.assertEqual(stats["by_category"], {"Geography": 1, "History": 1})
+        
+        questions.append({"category": "History", "difficulty": "Hard"})
+        stats = get_question_stats(questions)
+        self.assertEqual(stats["total"], 3)
+        self.assertEqual(stats["by_category"], {"Geography": 1, "History": 2})
+        self.assertEqual(stats["by_difficulty"], {"Easy": 2, "Hard": 1})
+
+
 class TestUserManager(unittest.TestCase):
     """Test user management."""
     
     def setUp(self):
         """Set up test user manager."""
-        self.manager = UserManager("output/test_users.json")
+        self.manager = UserManager("output/test_users.db")
     
     def tearDown(self):
         """Clean up test file."""
-        test_file = Path("output/test_users.json")
+        self.manager.close()
+        test_file = Path("output/test_users.db")
         if test_file.exists():
             test_file.unlink()
     
@@ -201,6 +353,168 @@ class TestUserManager(unittest.TestCase):
         stats = self.manager.get_stats("test_user")
         self.assertEqual(stats["total_sessions"], 1)
         self.assertEqual(stats["total_questions_generated"], 500)
+    
+    def test_get_stats_latest_session(self):
+        """Test that the latest session in the stats is the newest one, not the first added."""
+        self.manager.login("test_user")
+        self.manager.add_session("test_user", {
+            "topics": ["Math"],
+            "questions_generated": 100,
+            "timestamp": "2024-01-01T10:00:00"
+        })
+        self.manager.add_session("test_user", {
+            "topics": ["History"],
+            "questions_generated": 200,
+            "timestamp": "2024-03-01T10:00:00"
+        })
+        
+        stats = self.manager.get_stats("test_user")
+        self.assertEqual(stats["latest_session"]["topics"], ["History"])
+    
+    def test_import_legacy_json(self):
+        """Test that an existing users.json is imported when the database is created."""
+        legacy_users = {
+            "alice": {
+                "created_at": "2024-01-01T09:00:00",
+                "sessions": [
+                    {"topics": ["Math"], "questions_generated": 100, "timestamp": "2024-01-02T10:00:00"},
+                    {"topics": ["AI", "Math"], "questions_generated": 300, "timestamp": "2024-02-05T10:00:00"},
+                    {"topics": "History", "questions_generated": 50, "timestamp": "2024-01-20T10:00:00"}
+                ],
+                "total_questions": 450
+            },
+            "bob": {
+                "created_at": "2024-03-01T09:00:00",
+                "sessions": [],
+                "total_questions": 0
+            }
+        }
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "users.json").write_text(json.dumps(legacy_users), encoding='utf-8')
+            manager = UserManager(str(Path(temp_dir) / "users.db"))
+            try:
+                users = manager.get_all_users()
+                self.assertEqual(set(users), {"alice", "bob"})
+                self.assertEqual(users["alice"]["created_at"], "2024-01-01T09:00:00")
+                self.assertEqual(users["alice"]["total_questions"], 450)
+                self.assertEqual(users["alice"]["sessions"], legacy_users["alice"]["sessions"])
+                self.assertEqual(users["bob"], legacy_users["bob"])
+                
+                sessions = manager.get_sessions("alice")
+                self.assertEqual(
+                    [session["timestamp"] for session in sessions],
+                    ["2024-02-05T10:00:00", "2024-01-20T10:00:00", "2024-01-02T10:00:00"]
+                )
+                
+                stats = manager.get_stats("alice")
+                self.assertEqual(stats["total_sessions"], 3)
+                self.assertEqual(stats["total_questions_generated"], 450)
+                self.assertEqual(sorted(stats["topics_list"]), ["AI", "History", "Math"])
+                self.assertEqual(stats["latest_session"]["timestamp"], "2024-02-05T10:00:00")
+            finally:
+                manager.close()
+            
+            # The import only runs when the database is first created
+            manager = UserManager(str(Path(temp_dir) / "users.db"))
+            try:
+                self.assertEqual(len(manager.get_sessions("alice")), 3)
+            finally:
+                manager.close()
+
+
+class TestServerStorage(unittest.TestCase):
+    """Test the server's questions file handling."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Import the server, which needs the API settings to load."""
+        try:
+            import server
+        except (ImportError, ValueError) as e:
+            raise unittest.SkipTest(f"server unavailable: {e}")
+        cls.server = server
+    
+    def setUp(self):
+        """Point the server at a temporary questions file."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.questions_file = Path(self.temp_dir.name) / "questions.json"
+        for name, value in [
+            ("QUESTIONS_FILE", self.questions_file),
+            ("_questions_cache", None),
+            ("_questions_mtime", None),
+            ("_questions_save_pending", False)
+        ]:
+            patcher = mock.patch.object(self.server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(self.temp_dir.cleanup)
+    
+    def test_append_questions(self):
+        """Test appending questions to an existing file."""
+        self.server.save_questions([{"question": "Q1"}])
+        total = self.server.append_questions([{"question": "Q2"}, {"question": "Q3"}])
+        
+        self.assertEqual(total, 3)
+        self.assertEqual(
+            json.loads(self.questions_file.read_text()),
+            [{"question": "Q1"}, {"question": "Q2"}, {"question": "Q3"}]
+        )
+    
+    def test_append_questions_to_non_array_file(self):
+        """Test that appending to a file not holding an array leaves it untouched."""
+        original = b'{"questions": [{"question": "Q1"}]}'
+        self.questions_file.write_bytes(original)
+        
+        with self.assertRaises(TypeError):
+            self.server.append_questions([{"question": "Q2"}])
+        self.assertEqual(self.questions_file.read_bytes(), original)
+    
+    def edit_first_question(self, text):
+        """Edit the cached questions the way /update-question does, leaving the save pending."""
+        questions = self.server.load_questions()
+        questions[0]["question"] = text
+        self.server._questions_save_pending = True
+    
+    def test_flush_questions_later(self):
+        """Test that a pending edit is written once the save delay has passed."""
+        self.server.save_questions([{"question": "Q1"}])
+        self.edit_first_question("Edited")
+        
+        with mock.patch.object(self.server, "SAVE_DEBOUNCE_SECONDS", 0):
+            asyncio.run(self.server.flush_questions_later())
+        
+        self.assertFalse(self.server._questions_save_pending)
+        self.assertEqual(json.loads(self.questions_file.read_text()), [{"question": "Edited"}])
+    
+    def test_export_writes_pending_edit(self):
+        """Test that exporting writes a pending edit first, leaving the delayed save nothing to do."""
+        self.server.save_questions([{"question": "Q1"}])
+        self.edit_first_question("Edited")
+        
+        response = asyncio.run(self.server.questions_file_response())
+        self.assertEqual(json.loads(self.questions_file.read_text()), [{"question": "Edited"}])
+        self.assertEqual(response.stat_result.st_size, self.questions_file.stat().st_size)
+        
+        with mock.patch.object(self.server, "SAVE_DEBOUNCE_SECONDS", 0), \
+                mock.patch.object(self.server, "save_questions") as save:
+            asyncio.run(self.server.flush_questions_later())
+        save.assert_not_called()
+    
+    def test_failed_flush_keeps_edit_pending(self):
+        """Test that a failed delayed save leaves the edit pending for the next write."""
+        self.server.save_questions([{"question": "Q1"}])
+        self.edit_first_question("Edited")
+        
+        with mock.patch.object(self.server, "SAVE_DEBOUNCE_SECONDS", 0), \
+                mock.patch.object(self.server, "save_questions", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                asyncio.run(self.server.flush_questions_later())
+        self.assertTrue(self.server._questions_save_pending)
+        
+        asyncio.run(self.server.questions_file_response())
+        self.assertFalse(self.server._questions_save_pending)
+        self.assertEqual(json.loads(self.questions_file.read_text()), [{"question": "Edited"}])
 
 
 def run_tests():
@@ -212,7 +526,9 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestChunker))
     suite.addTests(loader.loadTestsFromTestCase(TestValidator))
     suite.addTests(loader.loadTestsFromTestCase(TestQualityScorer))
+    suite.addTests(loader.loadTestsFromTestCase(TestJsonSaver))
     suite.addTests(loader.loadTestsFromTestCase(TestUserManager))
+    suite.addTests(loader.loadTestsFromTestCase(TestServerStorage))
     
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)